@@ -2,15 +2,23 @@
 import os
 import asyncio
 import logging
-from datetime import datetime
+from collections import OrderedDict
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import aiohttp
 import aiofiles
+import aiofiles.os as aos
+import orjson
+import re
+import string
+import time
 import urllib.parse
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
-from pyrogram import Client, filters
+from fastapi.responses import FileResponse, ORJSONResponse
+from pyrogram import Client, enums, filters
+from pyrogram.errors import FloodWait
+from pyrogram.file_id import FileId
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 
 from config import Config
@@ -25,18 +33,50 @@ logger = logging.getLogger("bot")
 
 
 # ================== FastAPI ==================
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 # ================== Constants ==================
 CHANNEL_USERNAME = "GBEXTREME"  # users see/join this
 NOTIFY_CHANNEL_ID = -1002986443155  # your channel for logs (@file2linc)
-DOWNLOADS_DIR = Path("downloads")
+# Absolute on purpose: pyrogram resolves relative download paths against the
+# launching script's directory (e.g. venv/bin under uvicorn), not the CWD
+DOWNLOADS_DIR = Path("downloads").resolve()
 DOWNLOADS_DIR.mkdir(exist_ok=True)
+# Leftovers older than this (e.g. from a crash mid-job) are swept hourly
+DOWNLOAD_MAX_AGE = 24 * 3600
+CLEANUP_INTERVAL = 3600
+# Download progress is only recorded every PROGRESS_STEP bytes
+PROGRESS_STEP = 4 << 20
+# Telegram serves files in 1 MiB parts; big files are fetched as several
+# concurrent part ranges (see download_workers)
+TG_CHUNK = 1 << 20
+MAX_DOWNLOAD_WORKERS = 8
+# Files above this size get their extents reserved up front (posix_fallocate)
+PREALLOCATE_MIN = 16 << 20
+# Channel logs are collected for up to NOTIFY_BATCH_WINDOW seconds and sent
+# as one message (Telegram caps messages at 4096 characters)
+NOTIFY_BATCH_WINDOW = 5.0
+NOTIFY_BATCH_CHARS = 3800
 
 # Optional whitelist: leave empty set() to allow everyone
 ALLOWED_USERS = set()  # e.g., {123456789}
 
+# Media attributes that carry their own file_name/file_size, in lookup order
+_MEDIA_FIELDS = ("document", "video", "audio")
+
+# file_unique_id -> Uploda.sh link of recent uploads (LRU, oldest evicted first)
+UPLOAD_CACHE_SIZE = 10_000
+_upload_cache: OrderedDict[str, str] = OrderedDict()
+# file_unique_id -> future resolving to the link of the upload in progress
+_inflight: dict[str, asyncio.Future] = {}
+
+# Filename sanitizing: translate table for ASCII names (runs in C), regex
+# fallback for anything else; both keep only letters, digits and "._ "
+_KEEP = set(string.ascii_letters + string.digits + "._ ")
+_TRANSLATE = {i: None for i in range(128) if chr(i) not in _KEEP}
+_UNSAFE_RE = re.compile(r"[^\w._ ]+")
+
 
 # ================== Global Bot ==================
 bot = Client(
@@ -44,34 +84,283 @@ bot = Client(
     api_id=Config.API_ID,
     api_hash=Config.API_HASH,
     bot_token=Config.BOT_TOKEN,
+    # lets parallel_download's ranged reads actually run side by side
+    max_concurrent_transmissions=MAX_DOWNLOAD_WORKERS,
 )
 
+# Shared HTTP session (opened on startup, closed on shutdown) so uploads
+# reuse pooled keep-alive connections instead of a new TLS handshake per file
+HTTP: aiohttp.ClientSession | None = None
+_cleanup_task: asyncio.Task | None = None
+_notify_task: asyncio.Task | None = None
+_notify_q: asyncio.Queue[str] = asyncio.Queue()
+_notify_unsent: list[str] = []
+UPLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=600)
+
 
 # ================== Helpers ==================
+# Every possible 10-cell bar, indexed by the number of filled cells, and the
+# full "bar + percentage" line for each permille step
+_BARS = tuple("🟩" * i + "⬜" * (10 - i) for i in range(11))
+_PROGRESS = tuple(f"{_BARS[p // 100]} {p / 10:.1f}%" for p in range(1001))
+# Plain-text progress message (sent with entity parsing disabled)
+_PROGRESS_TEMPLATE = "⏬ Downloading...\n{bar}\n{done:.1f}MB / {total:.1f}MB"
+
+
 def make_progress_bar(current: int, total: int, length: int = 10) -> str:
     if not total:
         return "⏳ Calculating..."
+    if length == 10:
+        return _PROGRESS[min(current * 1000 // total, 1000)]
     pct = current / total
     filled = int(length * pct)
     return f"{'🟩' * filled}{'⬜' * (length - filled)} {pct * 100:.1f}%"
 
 
+# Per-second cache of formatted timestamps: [epoch second, display, ISO 8601]
+_clock = [0, "", ""]
+
+
+def _refresh_clock() -> list:
+    t = int(time.time())
+    if t != _clock[0]:
+        lt = time.localtime(t)
+        _clock[0] = t
+        _clock[1] = time.strftime("%Y-%m-%d %H:%M:%S", lt)
+        _clock[2] = time.strftime("%Y-%m-%dT%H:%M:%S", lt)
+    return _clock
+
+
+def now_str() -> str:
+    """Local time as 'YYYY-mm-dd HH:MM:SS', formatted at most once per second."""
+    return _refresh_clock()[1]
+
+
+def now_iso() -> str:
+    """Local time in ISO 8601 (second precision), formatted at most once per second."""
+    return _refresh_clock()[2]
+
+
+def safe_filename(file_name: str) -> str:
+    """Strips everything but letters, digits and "._ " from a filename."""
+    if file_name.isascii():
+        name = file_name.translate(_TRANSLATE)
+    else:
+        name = _UNSAFE_RE.sub("", file_name)
+    return name.strip() or "file"
+
+
+def media_meta(m: Message) -> tuple[str, int]:
+    """Returns (file_name, file_size) of the message's media in one pass."""
+    for attr in _MEDIA_FIELDS:
+        media = getattr(m, attr)
+        if media:
+            return media.file_name or attr, media.file_size or 0
+    if m.photo:
+        return f"photo_{m.id}.jpg", m.photo.file_size or 0
+    return "file", 0
+
+
+def cached_link(uid: str) -> str | None:
+    """Returns the link of an earlier upload with the same content, if known."""
+    link = _upload_cache.get(uid)
+    if link:
+        _upload_cache.move_to_end(uid)
+    return link
+
+
+def remember_link(uid: str, link: str):
+    """Caches link for uid, evicting the least recently used entry past the cap."""
+    _upload_cache[uid] = link
+    _upload_cache.move_to_end(uid)
+    if len(_upload_cache) > UPLOAD_CACHE_SIZE:
+        _upload_cache.popitem(last=False)
+
+
+def completed_text(file_name: str, file_size: int, link: str) -> str:
+    """HTML body of the "upload completed" reply."""
+    return (
+        "✅ <b>Upload Completed!</b>\n\n"
+        f"📁 <b>File Name:</b> <code>{file_name}</code>\n"
+        f"📦 <b>File Size:</b> {file_size/1024/1024:.2f} MB\n\n"
+        f"🔗 <b>File Link:</b> {link}\n"
+        f"🔗 <b>File Link (Easy Copy):</b> {link}\n\n"
+        f"📮 Join @{CHANNEL_USERNAME}"
+    )
+
+
+async def edit_quietly(msg: Message, text: str, **kwargs):
+    """Best-effort edit_text for status messages: failures are only logged."""
+    try:
+        await msg.edit_text(text, **kwargs)
+    except Exception as e:
+        logger.debug(f"Status edit skipped: {e}")
+
+
+async def progress_pump(progress_msg: Message, state: dict, interval: float = 2.0):
+    """Edits progress_msg with the latest state, at most once per interval."""
+    dirty = state["dirty"]
+    last_text = None
+    while True:
+        await dirty.wait()
+        dirty.clear()
+        cur, total = state["cur"], state["total"]
+        text = _PROGRESS_TEMPLATE.format(
+            bar=make_progress_bar(cur, total),
+            done=cur / 1024 / 1024,
+            total=total / 1024 / 1024,
+        )
+        if text == last_text:
+            continue
+        try:
+            await progress_msg.edit_text(text, parse_mode=enums.ParseMode.DISABLED)
+            last_text = text
+        except FloodWait as e:
+            # back off as told, then retry with whatever is newest by then
+            await asyncio.sleep(e.value)
+            dirty.set()
+        except Exception as e:
+            logger.debug(f"Progress edit skipped: {e}")
+        await asyncio.sleep(interval)
+
+
+def download_workers(file_size: int) -> int:
+    """Number of concurrent part ranges to fetch a file of file_size with."""
+    if file_size < 10 << 20:
+        return 1
+    if file_size < 50 << 20:
+        return 2
+    if file_size < 1 << 30:
+        return 4
+    return MAX_DOWNLOAD_WORKERS
+
+
+async def parallel_download(
+    message: Message, path: Path, total: int, workers: int, progress
+):
+    """Downloads the media as `workers` concurrent part ranges written in place."""
+    chunks = -(-total // TG_CHUNK)
+    per_worker = -(-chunks // workers)
+    done = 0
+
+    async def fetch(first: int, count: int):
+        nonlocal done
+        start = offset = first * TG_CHUNK
+        async for chunk in bot.stream_media(message, limit=count, offset=first):
+            # one plain syscall per 1 MiB chunk; cheaper than a thread hop
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+            done += len(chunk)
+            await progress(done, total)
+        # pyrogram logs and swallows mid-transfer errors, ending the stream
+        # early; a short range would leave a hole in the preallocated file
+        expected = min(count * TG_CHUNK, total - start)
+        if offset - start != expected:
+            raise IOError(
+                f"range at part {first} ended after {offset - start} "
+                f"of {expected} bytes"
+            )
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if total > PREALLOCATE_MIN and hasattr(os, "posix_fallocate"):
+            try:
+                await asyncio.to_thread(os.posix_fallocate, fd, 0, total)
+            except OSError:
+                pass  # not supported by every filesystem; pwrite extends the file
+        async with asyncio.TaskGroup() as tg:
+            for first in range(0, chunks, per_worker):
+                tg.create_task(fetch(first, min(per_worker, chunks - first)))
+    finally:
+        os.close(fd)
+
+
+async def on_home_dc(message: Message) -> bool:
+    """Whether the message's media is stored on the bot's own DC.
+
+    Every ranged read opens its own media session; on a foreign DC that also
+    means a fresh auth key exchange and a flood-limited ExportAuthorization,
+    so such files are only ever fetched as a single stream.
+    """
+    media = getattr(message, message.media.value, None) if message.media else None
+    file_id = getattr(media, "file_id", None)
+    if not file_id:
+        return False
+    return FileId.decode(file_id).dc_id == await bot.storage.dc_id()
+
+
+def root_error(e: BaseException) -> BaseException:
+    """First leaf exception of a (possibly nested) TaskGroup ExceptionGroup."""
+    while isinstance(e, BaseExceptionGroup):
+        e = e.exceptions[0]
+    return e
+
+
 async def download_telegram_file(
-    message: Message, path: Path, progress_msg: Message
+    message: Message, path: Path, progress_msg: Message, file_size: int = 0
 ) -> bool:
     """Downloads the file to a temp path with live progress."""
+    # progress ticks only record the latest numbers; a single pump task turns
+    # them into (rate-limited) message edits
+    state = {
+        "cur": 0,
+        "total": 0,
+        "next_at": 0,
+        "bucket": -1,
+        "dirty": asyncio.Event(),
+    }
+
+    async def progress(cur: int, total: int):
+        # cheap integer gate: ignore ticks until another PROGRESS_STEP arrived
+        if cur < state["next_at"] and cur != total:
+            return
+        state["next_at"] = cur + PROGRESS_STEP
+        # and only report when crossing a 5% step: at most 21 edits per file
+        bucket = cur * 20 // total if total else 0
+        if bucket == state["bucket"] and cur != total:
+            return
+        state["bucket"] = bucket
+        state["cur"], state["total"] = cur, total
+        state["dirty"].set()
+
+    pump = asyncio.create_task(progress_pump(progress_msg, state))
     try:
-        await message.download(
-            file_name=str(path),
-            progress=lambda cur, total: asyncio.get_event_loop().create_task(
-                progress_msg.edit_text(
-                    f"⏬ Downloading...\n{make_progress_bar(cur, total)}\n"
-                    f"{cur/1024/1024:.1f}MB / {total/1024/1024:.1f}MB"
-                )
-            ),
-        )
+        try:
+            workers = download_workers(file_size)
+            if workers > 1 and not await on_home_dc(message):
+                workers = 1
+            if workers > 1:
+                try:
+                    await parallel_download(
+                        message, path, file_size, workers, progress
+                    )
+                    return True
+                except Exception as e:
+                    logger.warning(
+                        f"Parallel download failed ({root_error(e)}), "
+                        "retrying as a single stream"
+                    )
+                    state["next_at"], state["bucket"] = 0, -1
+                    # drop the partial, preallocated (full-length) file so it
+                    # can never pass for a finished download
+                    try:
+                        await aos.remove(path)
+                    except FileNotFoundError:
+                        pass
+            # pyrogram returns None (or a short file) instead of raising when
+            # the transfer fails
+            result = await message.download(file_name=str(path), progress=progress)
+            if not result:
+                raise IOError("Telegram download did not complete")
+            if Path(result) != path:
+                raise IOError(f"Telegram download landed at {result}, not {path}")
+            if file_size and (await aos.stat(path)).st_size != file_size:
+                raise IOError("Telegram download ended early")
+        finally:
+            pump.cancel()
         return True
     except Exception as e:
+        e = root_error(e)
         logger.error(f"Download failed: {e}")
         try:
             await progress_msg.edit_text(f"❌ Download failed: {e}")
@@ -80,34 +369,59 @@ async def download_telegram_file(
         return False
 
 
+async def _file_iter(file_path: str, chunk_size: int = 1 << 20):
+    """Yields the file's contents in chunk_size pieces without blocking the loop."""
+    async with aiofiles.open(file_path, "rb") as f:
+        while chunk := await f.read(chunk_size):
+            yield chunk
+
+
+class SizedFilePayload(aiohttp.AsyncIterablePayload):
+    """Streams a file via _file_iter while still advertising its byte size, so
+    the multipart request is sent with a Content-Length instead of chunked."""
+
+    def __init__(self, file_path: str, size: int, **kwargs):
+        super().__init__(_file_iter(file_path), **kwargs)
+        self._size = size
+
+
 async def upload_to_uplodash(file_path: str) -> str | None:
     """Uploads the local file to Uploda.sh and returns a share URL, or None on fail."""
     try:
-        async with aiohttp.ClientSession() as session:
-            form = aiohttp.FormData()
-            # use normal file object so aiohttp can stream it
-            form.add_field(
-                "file",
-                open(file_path, "rb"),
-                filename=os.path.basename(file_path),
-                content_type="application/octet-stream",
-            )
-            async with session.post("https://uploda.sh/api/upload", data=form) as resp:
-                if resp.status != 200:
-                    logger.warning(f"Uploda.sh HTTP {resp.status}")
-                    return None
-                data = await resp.json()
-                if data.get("success"):
-                    return data["data"]["url"]
-                logger.warning(f"Uploda.sh error payload: {data}")
+        # stream the file in fixed chunks so memory stays bounded and reads
+        # never block the event loop
+        size = (await aos.stat(file_path)).st_size
+        part = SizedFilePayload(
+            file_path, size, content_type="application/octet-stream"
+        )
+        # form-data parts must carry their disposition before being appended
+        part.set_content_disposition(
+            "form-data", name="file", filename=os.path.basename(file_path)
+        )
+        form = aiohttp.MultipartWriter("form-data")
+        form.append_payload(part)
+        async with HTTP.post(
+            "https://uploda.sh/api/upload", data=form, timeout=UPLOAD_TIMEOUT
+        ) as resp:
+            if resp.status != 200:
+                logger.warning(f"Uploda.sh HTTP {resp.status}")
+                return None
+            body = await resp.read()
+            if not body:
+                logger.warning("Uploda.sh returned an empty body")
                 return None
+            data = orjson.loads(body)
+            if data.get("success"):
+                return data["data"]["url"]
+            logger.warning(f"Uploda.sh error payload: {data}")
+            return None
     except Exception as e:
         logger.error(f"Upload to Uploda.sh failed: {e}")
         return None
 
 
-async def notify_channel(user, file_name: str, file_size_bytes: int, link: str):
-    """Sends a log message to your channel when a link is generated."""
+def notify_channel(user, file_name: str, file_size_bytes: int, link: str):
+    """Queues a log message for your channel when a link is generated."""
     try:
         name = (user.first_name or "") + (
             " " + user.last_name if user.last_name else ""
@@ -121,43 +435,141 @@ async def notify_channel(user, file_name: str, file_size_bytes: int, link: str):
             f"📁 <b>File:</b> <code>{file_name}</code>\n"
             f"📦 <b>Size:</b> {size_mb:.2f} MB\n"
             f"🔗 <b>Link:</b> {link}\n"
-            f"⏰ <i>{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>"
+            f"⏰ <i>{now_str()}</i>"
         )
-        await bot.send_message(NOTIFY_CHANNEL_ID, text, disable_web_page_preview=True)
+        _notify_q.put_nowait(text)
     except Exception as e:
         logger.warning(f"notify_channel failed: {e}")
 
 
+async def _send_notify_batch(batch: list[str]):
+    """Posts one batch to the channel, waiting out any FloodWait."""
+    text = "\n\n".join(batch)
+    while True:
+        try:
+            await bot.send_message(
+                NOTIFY_CHANNEL_ID, text, disable_web_page_preview=True
+            )
+            return
+        except FloodWait as e:
+            await asyncio.sleep(e.value)
+        except Exception as e:
+            logger.warning(f"Channel notification failed: {e}")
+            return
+
+
+async def notify_sender():
+    """Sends queued channel logs, batching up to NOTIFY_BATCH_CHARS per message."""
+    loop = asyncio.get_running_loop()
+    batch: list[str] = []
+    held = None
+    try:
+        while True:
+            first = held if held is not None else await _notify_q.get()
+            held = None
+            batch, size = [first], len(first)
+            deadline = loop.time() + NOTIFY_BATCH_WINDOW
+            while (timeout := deadline - loop.time()) > 0:
+                # asyncio.timeout, not wait_for: on 3.11 wait_for can swallow a
+                # cancel that races a get(), which would hang shutdown
+                try:
+                    async with asyncio.timeout(timeout):
+                        text = await _notify_q.get()
+                except asyncio.TimeoutError:
+                    break
+                if size + len(text) + 2 > NOTIFY_BATCH_CHARS:
+                    held = text  # starts the next batch
+                    break
+                batch.append(text)
+                size += len(text) + 2
+            await _send_notify_batch(batch)
+            batch = []
+    except asyncio.CancelledError:
+        # hand what was collected but not sent yet to flush_notifications()
+        _notify_unsent.extend(batch)
+        if held is not None:
+            _notify_unsent.append(held)
+        raise
+
+
+async def flush_notifications():
+    """Sends every log still held by notify_sender or queued (on shutdown)."""
+    pending = _notify_unsent[:]
+    _notify_unsent.clear()
+    while not _notify_q.empty():
+        pending.append(_notify_q.get_nowait())
+    batch, size = [], 0
+    for text in pending:
+        if batch and size + len(text) + 2 > NOTIFY_BATCH_CHARS:
+            await _send_notify_batch(batch)
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text) + 2
+    if batch:
+        await _send_notify_batch(batch)
+
+
+def _sweep_downloads() -> int:
+    """Deletes files in DOWNLOADS_DIR older than DOWNLOAD_MAX_AGE (blocking)."""
+    cutoff = time.time() - DOWNLOAD_MAX_AGE
+    removed = 0
+    with os.scandir(DOWNLOADS_DIR) as it:
+        for de in it:
+            try:
+                if de.is_file() and de.stat().st_mtime < cutoff:
+                    os.unlink(de.path)
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove {de.path}: {e}")
+    return removed
+
+
+async def cleanup_old_files():
+    """Periodically sweeps stale downloads in a worker thread."""
+    while True:
+        try:
+            removed = await asyncio.to_thread(_sweep_downloads)
+            if removed:
+                logger.info(f"Removed {removed} stale download(s).")
+        except Exception as e:
+            logger.warning(f"cleanup_old_files failed: {e}")
+        await asyncio.sleep(CLEANUP_INTERVAL)
+
+
 # ================== Handlers ==================
+# Built once and shared by every /start reply
+START_KB = InlineKeyboardMarkup(
+    [
+        [
+            InlineKeyboardButton(
+                "📢 Join Channel", url=f"https://t.me/{CHANNEL_USERNAME}"
+            )
+        ],
+        [
+            InlineKeyboardButton(
+                "✅ I Have Joined", callback_data="joined_ignore_check"
+            )
+        ],
+    ]
+)
+JOINED_RE = re.compile(r"^joined_ignore_check$")
+
+
 @bot.on_message(filters.command("start"))
 async def start_handler(c: Client, m: Message):
     try:
-        kb = InlineKeyboardMarkup(
-            [
-                [
-                    InlineKeyboardButton(
-                        "📢 Join Channel", url=f"https://t.me/{CHANNEL_USERNAME}"
-                    )
-                ],
-                [
-                    InlineKeyboardButton(
-                        "✅ I Have Joined", callback_data="joined_ignore_check"
-                    )
-                ],
-            ]
-        )
         await m.reply_text(
             f"👋 Welcome {m.from_user.first_name}!\n\n"
             f"To use this bot, please join @{CHANNEL_USERNAME}.\n"
             f"After joining, tap <b>✅ I Have Joined</b>.",
-            reply_markup=kb,
+            reply_markup=START_KB,
             parse_mode="HTML",
         )
     except Exception as e:
         logger.error(f"/start error: {e}")
 
 
-@bot.on_callback_query(filters.regex("^joined_ignore_check$"))
+@bot.on_callback_query(filters.regex(JOINED_RE))
 async def joined_ignore_check(c: Client, q):
     """Allow usage without re-checking membership."""
     try:
@@ -178,72 +590,89 @@ async def on_media(c: Client, m: Message):
             return await m.reply_text("⚠️ Join @GBEXTREME to use this bot.")
 
         # Detect file meta
-        file_name = (
-            m.document.file_name
-            if m.document
-            else (
-                m.video.file_name
-                if m.video
-                else (
-                    m.audio.file_name
-                    if m.audio
-                    else f"photo_{m.id}.jpg" if m.photo else "file"
-                )
-            )
-        )
-        file_size = (
-            m.document.file_size
-            if m.document
-            else (
-                m.video.file_size
-                if m.video
-                else (
-                    m.audio.file_size
-                    if m.audio
-                    else (m.photo.sizes[-1].file_size if m.photo else 0)
-                )
+        file_name, file_size = media_meta(m)
+
+        safe_name = safe_filename(file_name)
+
+        # Same content uploaded before: reuse its link, skip download + upload
+        media = getattr(m, m.media.value, None) if m.media else None
+        uid = getattr(media, "file_unique_id", None)
+        link = prog = None
+        while uid:
+            link = cached_link(uid)
+            pending = _inflight.get(uid)
+            if link or pending is None:
+                break
+            # identical file is being processed right now: wait for its link;
+            # if that job fails, re-check so only one waiter takes over
+            if prog is None:
+                prog = await m.reply_text("⏳ Same file is already being uploaded...")
+            link = await asyncio.shield(pending)
+            if link:
+                break
+        if link:
+            send = prog.edit_text if prog else m.reply_text
+            await send(
+                completed_text(safe_name, file_size, link),
+                parse_mode="HTML",
+                disable_web_page_preview=True,
             )
-        )
-
-        safe_name = (
-            "".join(c for c in file_name if c.isalnum() or c in "._ ").strip() or "file"
-        )
-        path = DOWNLOADS_DIR / f"{m.id}_{safe_name}"
-
-        prog = await m.reply_text("⏳ Preparing...")
-
-        # Download from Telegram
-        ok = await download_telegram_file(m, path, prog)
-        if not ok:
+            notify_channel(m.from_user, safe_name, file_size, link)
             return
 
-        await prog.edit_text("📤 Uploading to Uploda.sh...")
-
-        # Upload to Uploda.sh
-        link = await upload_to_uplodash(str(path))
-        if not link:
-            return await prog.edit_text("❌ Upload failed. Please try again later.")
+        path = DOWNLOADS_DIR / f"{m.id}_{safe_name}"
+        if uid:
+            job = asyncio.get_running_loop().create_future()
+            _inflight[uid] = job
 
-        # Delete local file (free space)
         try:
-            os.remove(path)
-        except Exception:
-            pass
-
-        # Final response
-        await prog.edit_text(
-            "✅ <b>Upload Completed!</b>\n\n"
-            f"📁 <b>File Name:</b> <code>{safe_name}</code>\n"
-            f"📦 <b>File Size:</b> {file_size/1024/1024:.2f} MB\n\n"
-            f"🔗 <b>File Link:</b> {link}\n"
-            f"🔗 <b>File Link (Easy Copy):</b> {link}\n\n"
-            f"📮 Join @{CHANNEL_USERNAME}",
-            parse_mode="HTML",
-            disable_web_page_preview=True,
-        )
+            if prog:
+                await prog.edit_text("⏳ Preparing...")
+            else:
+                prog = await m.reply_text("⏳ Preparing...")
+
+            # Download from Telegram
+            ok = await download_telegram_file(m, path, prog, file_size)
+            if not ok:
+                return
+
+            # Upload to Uploda.sh; the (cosmetic) status edit runs alongside and
+            # can never abort the upload
+            status = asyncio.create_task(
+                edit_quietly(prog, "📤 Uploading to Uploda.sh...")
+            )
+            link = await upload_to_uplodash(str(path))
+            await status  # so it can't land after the final edit below
+            if not link:
+                return await prog.edit_text("❌ Upload failed. Please try again later.")
+
+            if uid:
+                remember_link(uid, link)
+                job.set_result(link)
+
+            # Final response
+            await prog.edit_text(
+                completed_text(safe_name, file_size, link),
+                parse_mode="HTML",
+                disable_web_page_preview=True,
+            )
 
-        # Notify your channel
-        await notify_channel(m.from_user, safe_name, file_size, link)
+            # Notify your channel (queued, sent in batches)
+            notify_channel(m.from_user, safe_name, file_size, link)
+        finally:
+            if uid:
+                # failed jobs hand waiters None so they retry on their own
+                if _inflight.get(uid) is job:
+                    del _inflight[uid]
+                if not job.done():
+                    job.set_result(None)
+            # Delete local file (free space), also when download/upload failed
+            try:
+                await aos.remove(path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Could not remove {path}: {e}")
 
     except Exception as e:
         logger.exception(f"on_media error: {e}")
@@ -261,22 +690,39 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return JSONResponse(
-        {
-            "status": "healthy",
-            "bot_connected": True,
-            "timestamp": datetime.now().isoformat(),
-        }
-    )
+    return {
+        "status": "healthy",
+        "bot_connected": True,
+        "timestamp": now_iso(),
+    }
 
 
 # ================== Startup / Shutdown ==================
 @app.on_event("startup")
 async def startup_event():
+    global HTTP, _cleanup_task, _notify_task
     try:
         logger.info("Starting bot…")
         Config.validate()
+        loop = asyncio.get_running_loop()
+        # size the loop's shared default executor: aiofiles, asyncio.to_thread
+        # and aiohttp's DNS lookups (getaddrinfo) all run on it
+        loop.set_default_executor(
+            ThreadPoolExecutor(
+                max_workers=Config.THREAD_POOL_SIZE, thread_name_prefix="fsio"
+            )
+        )
+        # Python 3.12+: tasks that finish without suspending skip the loop
+        if hasattr(asyncio, "eager_task_factory"):
+            loop.set_task_factory(asyncio.eager_task_factory)
+        HTTP = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100, ttl_dns_cache=300, keepalive_timeout=75
+            )
+        )
         await bot.start()
+        _cleanup_task = asyncio.create_task(cleanup_old_files())
+        _notify_task = asyncio.create_task(notify_sender())
         logger.info("Bot started successfully.")
     except Exception as e:
         logger.error(f"Startup failed: {e}")
@@ -284,8 +730,17 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if _cleanup_task is not None:
+        _cleanup_task.cancel()
+    if _notify_task is not None:
+        _notify_task.cancel()
+        await asyncio.gather(_notify_task, return_exceptions=True)
+    # deliver pending channel logs while the client is still connected
+    await flush_notifications()
     try:
         await bot.stop()
         logger.info("Bot stopped.")
     except Exception as e:
         logger.error(f"Shutdown error: {e}")
+    if HTTP is not None:
+        await HTTP.close()
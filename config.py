@@ -9,6 +9,7 @@ class Config:
     BOT_TOKEN = os.getenv("BOT_TOKEN")        # Optional if you want bot token fallbac
     BASE_URL = os.getenv("BASE_URL")
     SESSION_NAME = "my_bot"
+    THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "4"))  # default executor threads
 
     @staticmethod
     def validate():